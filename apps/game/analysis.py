@@ -0,0 +1,194 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from engine.search import analyse_state
+from engine.symmetry import canonical_key, transform_move
+
+
+class AnalysisJob:
+    """
+    Analysis of a single position. The service replaces self.info with a
+    fresh dict after every completed depth, so readers always see a
+    consistent snapshot without taking a lock.
+    The key is the canonical key of the position, and transform maps the
+    board that was actually searched onto it. search holds the arguments
+    for engine.search.analyse_state, without the depth.
+    """
+
+    def __init__(self, key: str, transform, search: tuple):
+        self.key = key
+        self.transform = transform
+        self.search = search
+        self.info = None
+        self.done = False
+        self.error = None
+        self.started = False
+        self.last_polled = time.monotonic()
+
+    def poll(self):
+        self.last_polled = time.monotonic()
+
+    def as_json(self, transform):
+        """
+        The latest result, as seen from a board that transform maps onto
+        the canonical position
+        """
+        info = self.info or {}
+        # searched board -> canonical -> asking board, transforms are their own inverse
+        line = [
+            transform_move(transform_move(move, self.transform), transform)
+            for move in info.get("line", [])
+        ]
+        score = info.get("score")
+        if score is not None and self.transform.swaps_colors != transform.swaps_colors:
+            score = -score
+        return {
+            "key": self.key,
+            "done": self.done,
+            "error": self.error,
+            "depth": info.get("depth", 0),
+            "score": score,
+            "line": line,
+            "nodes": info.get("nodes", 0),
+        }
+
+
+class AnalysisService:
+    """
+    Runs analysis in a pool of worker processes, so searching never holds
+    the GIL the request threads need. The job table and scheduling stay in
+    this process: each job is searched one depth at a time, and the next
+    depth is only started while someone is still polling it.
+    Jobs are keyed by canonical position key, so any number of requests for
+    the same position, or a symmetric copy of it, share one computation.
+    The most recent jobs are kept around so repeat requests are answered
+    from the finished result.
+    At most max_pending jobs wait for a worker at once, and a job nobody has
+    polled for poll_timeout seconds is dropped instead of started or deepened.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_depth: int,
+        max_jobs: int = 256,
+        max_pending: int = 32,
+        poll_timeout: float = 10,
+    ):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.poll_timeout = poll_timeout
+        self.jobs = OrderedDict()
+        self.waiting = deque()
+        self.running = 0
+        # reentrant, a future that is already finished runs its callback
+        # straight away in the thread that added it
+        self.lock = threading.RLock()
+        # spawned rather than forked, forking a threaded server is unsafe,
+        # and niced so the request threads win any fight over the cpus
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=os.nice,
+            initargs=(10,),
+        )
+
+    def submit(self, board):
+        """
+        Returns the job analysing the board's position, starting one if
+        this position is not already being (or been) analysed, together
+        with the transform from the board to the canonical position.
+        The job is None if too many jobs are already waiting for a worker.
+        """
+        key, transform = canonical_key(board)
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None:
+                job.poll()
+                self.jobs.move_to_end(key)
+                return job, transform
+            if len(self.waiting) >= self.max_pending:
+                return None, transform
+            job = AnalysisJob(
+                key, transform, (board.to_state(), board.turn, board.variant)
+            )
+            self.jobs[key] = job
+            self.waiting.append(job)
+            self.__evict()
+            self.__schedule()
+        return job, transform
+
+    def __wanted(self, job) -> bool:
+        # still in the table and polled recently
+        if self.jobs.get(job.key) is not job:
+            return False
+        if time.monotonic() - job.last_polled > self.poll_timeout:
+            # everyone asking has moved on, a later poll starts it afresh
+            del self.jobs[job.key]
+            return False
+        return True
+
+    def __schedule(self):
+        # start waiting jobs while there are idle workers, lock held
+        while self.running < self.workers and self.waiting:
+            job = self.waiting.popleft()
+            if self.__wanted(job):
+                job.started = True
+                self.__start(job, 1)
+
+    def __start(self, job, depth: int):
+        try:
+            future = self.executor.submit(analyse_state, *job.search, depth)
+        except RuntimeError as e:
+            # the pool is shut down or broken, the server is going away
+            job.error = repr(e)
+            job.done = True
+            return
+        self.running += 1
+        future.add_done_callback(partial(self.__finished, job, depth))
+
+    def __finished(self, job, depth: int, future):
+        # runs on the executor's management thread
+        try:
+            info = future.result()
+        except Exception as e:
+            info = None
+            job.error = repr(e)
+        with self.lock:
+            self.running -= 1
+            if info is not None:
+                job.info = info
+            # a shallower result means a mate was found, deeper is pointless
+            deeper = info is not None and info["depth"] == depth < self.max_depth
+            if deeper and self.__wanted(job):
+                self.__start(job, depth + 1)
+            else:
+                job.done = True
+                self.__schedule()
+
+    def __evict(self):
+        # drop the oldest jobs that are finished or still waiting, a waiting
+        # one is skipped when its turn comes, running ones are kept
+        for key in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            job = self.jobs[key]
+            if job.done or not job.started:
+                del self.jobs[key]
+
+
+service = AnalysisService(
+    workers=getattr(settings, "ANALYSIS_WORKERS", 2),
+    max_depth=getattr(settings, "ANALYSIS_MAX_DEPTH", 4),
+    max_pending=getattr(settings, "ANALYSIS_MAX_PENDING", 32),
+    poll_timeout=getattr(settings, "ANALYSIS_POLL_TIMEOUT", 10),
+)
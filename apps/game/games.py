@@ -0,0 +1,133 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from engine.board import Board
+from engine.history import History, Position
+
+DEFAULT_GAME = "main"
+
+
+class GameSession:
+    """
+    A game being played. Every change to the board goes through the game's
+    own lock and bumps its version, so clicks from a page showing an older
+    version can be told apart and rejected instead of being applied twice.
+    """
+
+    def __init__(self, game_id: str):
+        self.id = game_id
+        self.board = Board()
+        self.history = History(Position.from_board(self.board))
+        self.lock = threading.Lock()
+        self.version = 0
+        # when the registry last handed the game out, for idle eviction
+        self.last_used = time.monotonic()
+
+    def click(self, q: int, r: int, version: int) -> bool | None:
+        """
+        Applies a click made on the given version of the game. Returns None
+        if the game has changed since, otherwise whether a move was played.
+        """
+        # most stale clicks are turned away here, without waiting on the lock
+        if version != self.version:
+            return None
+        with self.lock:
+            if version != self.version:
+                return None
+            selected = self.board.selected_hex
+            highlighted = self.__highlighted()
+            moved = self.board.on_click(q, r)
+            if moved:
+                self.history.push((selected.q, selected.r), (q, r))
+            # clicks that change nothing keep the version, so pages showing
+            # it stay current and their next click is still accepted
+            if (
+                moved
+                or self.board.selected_hex is not selected
+                or self.__highlighted() != highlighted
+            ):
+                self.version += 1
+            return moved
+
+    def __highlighted(self) -> list:
+        return [tile for tile in self.board.hexes if tile.highlighted]
+
+    def go_to(self, ply: int, version: int) -> bool | None:
+        """
+        Takes back or replays moves until the board shows the given ply.
+        Returns None if the game has changed since version, otherwise
+        whether there was such a ply.
+        """
+        if version != self.version:
+            return None
+        with self.lock:
+            if version != self.version:
+                return None
+            if not self.history.jump(ply):
+                return False
+            self.board = self.history.current.to_board(self.board.variant)
+            self.version += 1
+            return True
+
+    def reset(self):
+        with self.lock:
+            self.board = Board()
+            self.history = History(Position.from_board(self.board))
+            self.version += 1
+
+
+class GameRegistry:
+    """
+    All the games in this process. Apart from the default game, which is
+    always there, games only come from create, so looking up an unknown id
+    never makes one. At most max_games are kept: to make room for a new one,
+    games nobody has asked for in idle_timeout seconds are dropped, and if
+    none are idle no game is made. Games in use are never dropped.
+    """
+
+    def __init__(self, max_games: int = 100, idle_timeout: float = 3600):
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self.games = {}
+        self.lock = threading.Lock()
+
+    def get(self, game_id: str, create: bool = False) -> GameSession | None:
+        """
+        The game with the given id, or None if there is no such game. With
+        create a missing game is made, if there is room for it.
+        """
+        # only held for the lookup, never while a game is played
+        with self.lock:
+            game = self.games.get(game_id)
+            if game is None:
+                if not (create or game_id == DEFAULT_GAME) or not self.__make_room():
+                    return None
+                game = GameSession(game_id)
+                self.games[game_id] = game
+            game.last_used = time.monotonic()
+        return game
+
+    def create(self) -> GameSession | None:
+        """
+        Starts a game with a new id, None if all max_games are in use
+        """
+        return self.get(uuid.uuid4().hex[:12], create=True)
+
+    def __make_room(self) -> bool:
+        if len(self.games) < self.max_games:
+            return True
+        now = time.monotonic()
+        for game_id, game in list(self.games.items()):
+            idle = now - game.last_used > self.idle_timeout
+            if idle and game_id != DEFAULT_GAME:
+                del self.games[game_id]
+        return len(self.games) < self.max_games
+
+
+registry = GameRegistry(
+    max_games=getattr(settings, "MAX_GAMES", 100),
+    idle_timeout=getattr(settings, "GAME_IDLE_TIMEOUT", 3600),
+)
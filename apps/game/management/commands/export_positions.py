@@ -0,0 +1,113 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import batched
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.game.models import Game
+from engine.variant import VARIANTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Export every position of stored or randomly generated games to "
+        "memory mappable .npy shards (format described in engine.export)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("out_dir", help="directory to write shards and manifest to")
+        parser.add_argument(
+            "--source",
+            choices=["db", "random"],
+            default="db",
+            help="export stored games, or play random games (default db)",
+        )
+        parser.add_argument("--variant", default="glinski", choices=list(VARIANTS))
+        parser.add_argument(
+            "--games", type=int, default=1000, help="number of random games"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="first random seed")
+        parser.add_argument(
+            "--games-per-task",
+            type=int,
+            default=200,
+            help="games handed to a worker process at a time (default 200)",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=50000,
+            help="most positions in one shard (default 50000)",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count(), help="worker processes"
+        )
+
+    def handle(self, *args, **options):
+        for option in ("games_per_task", "shard_size", "workers"):
+            if options[option] < 1:
+                flag = option.replace("_", "-")
+                raise CommandError(f"--{flag} must be at least 1")
+        try:
+            from engine.export import ShardWriter, encode_games, write_manifest
+        except ImportError:
+            raise CommandError(
+                'numpy is needed to export, install the "export" extra'
+            ) from None
+
+        out_dir = Path(options["out_dir"])
+        out_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+
+        writer = ShardWriter(out_dir, "shard", options["shard_size"])
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            pending = deque()
+            for task in self.tasks(options):
+                # only keep a couple of tasks per worker queued, so the games
+                # waiting to be exported never all sit in memory at once.
+                # Results are taken in order, so the shards do not depend on
+                # which worker finishes first
+                if len(pending) >= 2 * options["workers"]:
+                    writer.add(*pending.popleft().result())
+                pending.append(executor.submit(encode_games, task))
+            while pending:
+                writer.add(*pending.popleft().result())
+        writer.flush()
+        shards = writer.shards
+
+        manifest = write_manifest(out_dir, options["variant"], shards)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{manifest['positions']} positions in {len(shards)} shards "
+                f"written to {out_dir} in {elapsed:.2f}s"
+            )
+        )
+
+    def tasks(self, options):
+        """
+        Generator of worker tasks, each with a chunk of games
+        """
+        if options["source"] == "random":
+            seeds = range(options["seed"], options["seed"] + options["games"])
+            chunks = (
+                {"seeds": list(chunk)}
+                for chunk in batched(seeds, options["games_per_task"])
+            )
+        else:
+            games = (
+                Game.objects.filter(variant=options["variant"])
+                .order_by("pk")
+                .values_list("moves", "result")
+                .iterator()
+            )
+            chunks = (
+                {"games": [(moves.split(), result) for moves, result in chunk]}
+                for chunk in batched(games, options["games_per_task"])
+            )
+        for chunk in chunks:
+            chunk["variant"] = options["variant"]
+            yield chunk
@@ -0,0 +1,100 @@
+import sys
+import time
+from itertools import batched
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.game.models import Game
+from engine.board import Board
+from engine.notation import read_games, replay
+from engine.variant import VARIANTS
+
+
+def validate(records):
+    """
+    Generator of (record, error) for each game record, where error is
+    None if every move was legal, otherwise (ply, move, reason)
+    """
+    for record in records:
+        variant = VARIANTS.get(record.tags.get("Variant", "glinski"))
+        if variant is None:
+            yield record, (0, "", f"unknown variant {record.tags['Variant']}")
+            continue
+        yield record, replay(Board(variant=variant), record.moves)
+
+
+def to_game(record) -> Game:
+    return Game(
+        event=record.tags.get("Event", ""),
+        white=record.tags.get("White", ""),
+        black=record.tags.get("Black", ""),
+        variant=record.tags.get("Variant", "glinski"),
+        result=record.result,
+        moves=" ".join(record.moves),
+        ply_count=len(record.moves),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream an archive of games (format described in engine.notation), "
+        "checking every move and optionally saving the legal games"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="archive to import, or - for stdin")
+        parser.add_argument(
+            "--save", action="store_true", help="write legal games to the database"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="games written per database query (default 500)",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["path"] == "-":
+            self.import_games(sys.stdin, options)
+            return
+        try:
+            with open(options["path"], encoding="utf-8") as archive:
+                self.import_games(archive, options)
+        except OSError as e:
+            raise CommandError(e)
+
+    def import_games(self, lines, options):
+        counts = {"accepted": 0, "rejected": 0}
+        start = time.perf_counter()
+
+        # every stage is a generator, so only one batch of games is ever in memory
+        games = self.accepted(validate(read_games(lines)), counts)
+        for batch in batched(games, options["batch_size"]):
+            if options["save"]:
+                Game.objects.bulk_create(batch)
+
+        elapsed = time.perf_counter() - start
+        total = counts["accepted"] + counts["rejected"]
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} games in {elapsed:.2f}s ({rate:.0f} games/s): "
+                f"{counts['accepted']} legal, {counts['rejected']} rejected"
+                + (", legal games saved" if options["save"] else "")
+            )
+        )
+
+    def accepted(self, validated, counts):
+        """
+        Reports rejected games as they come and yields the legal ones as Games
+        """
+        for record, error in validated:
+            if error is None:
+                counts["accepted"] += 1
+                yield to_game(record)
+                continue
+            counts["rejected"] += 1
+            ply, move, reason = error
+            self.stderr.write(f"game at line {record.line}: ply {ply} {move}: {reason}")
@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-19 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Game",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("event", models.CharField(blank=True, max_length=200)),
+                ("white", models.CharField(blank=True, max_length=200)),
+                ("black", models.CharField(blank=True, max_length=200)),
+                ("variant", models.CharField(default="glinski", max_length=50)),
+                ("result", models.CharField(default="*", max_length=7)),
+                ("moves", models.TextField(blank=True)),
+                ("ply_count", models.PositiveIntegerField(default=0)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -1,3 +1,22 @@
 from django.db import models
 
 # Create your models here.
+
+
+class Game(models.Model):
+    """
+    A finished or imported game, with its moves stored in the notation
+    from engine.notation, separated by spaces
+    """
+
+    event = models.CharField(max_length=200, blank=True)
+    white = models.CharField(max_length=200, blank=True)
+    black = models.CharField(max_length=200, blank=True)
+    variant = models.CharField(max_length=50, default="glinski")
+    result = models.CharField(max_length=7, default="*")
+    moves = models.TextField(blank=True)
+    ply_count = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.white or '?'} vs {self.black or '?'} ({self.result})"
@@ -1,3 +1,274 @@
+import threading
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 
+from engine.board import Board
+from engine.notation import move_name, read_games, replay
+from engine.symmetry import (
+    ROTATE,
+    TRANSFORMS,
+    canonical_key,
+    transform_move,
+    valid_transforms,
+)
+
+from .analysis import AnalysisJob
+from .games import DEFAULT_GAME, GameRegistry, GameSession, registry
+
 # Create your tests here.
+
+
+def movable_piece(board):
+    """
+    (piece hex, destination hex) for some piece of the side to move
+    """
+    for tile in board.hexes:
+        if tile.piece and tile.piece.color == board.turn:
+            moves = board.get_legal_moves(tile.q, tile.r)
+            if moves:
+                return tile, moves[0]
+    raise AssertionError("no piece can move")
+
+
+class GameSessionTests(TestCase):
+    def setUp(self):
+        self.game = GameSession("test")
+        self.piece, self.dest = movable_piece(self.game.board)
+
+    def test_selecting_bumps_version(self):
+        self.assertIs(self.game.click(self.piece.q, self.piece.r, 0), False)
+        self.assertEqual(self.game.version, 1)
+        self.assertIs(self.game.board.selected_hex, self.piece)
+
+    def test_noop_clicks_keep_version(self):
+        # an empty hex with nothing selected
+        empty = next(tile for tile in self.game.board.hexes if not tile.piece)
+        self.assertIs(self.game.click(empty.q, empty.r, 0), False)
+        self.assertEqual(self.game.version, 0)
+        # the selected piece again
+        self.game.click(self.piece.q, self.piece.r, 0)
+        self.game.click(self.piece.q, self.piece.r, 1)
+        self.assertEqual(self.game.version, 1)
+        self.assertIs(self.game.board.selected_hex, self.piece)
+
+    def test_move_is_recorded(self):
+        self.game.click(self.piece.q, self.piece.r, 0)
+        self.assertIs(self.game.click(self.dest.q, self.dest.r, 1), True)
+        self.assertEqual(self.game.version, 2)
+        self.assertEqual(self.game.board.turn, 1)
+        self.assertEqual(
+            self.game.history.moves,
+            [((self.piece.q, self.piece.r), (self.dest.q, self.dest.r))],
+        )
+
+    def test_stale_click_is_rejected(self):
+        self.game.click(self.piece.q, self.piece.r, 0)
+        self.assertIsNone(self.game.click(self.dest.q, self.dest.r, 0))
+        self.assertEqual(self.game.version, 1)
+        self.assertEqual(self.game.board.turn, 0)
+
+    def test_racing_clicks_apply_once(self):
+        threads = 8
+        barrier = threading.Barrier(threads)
+        results = []
+
+        def click():
+            barrier.wait()
+            results.append(self.game.click(self.piece.q, self.piece.r, 0))
+
+        workers = [threading.Thread(target=click) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(results.count(False), 1)
+        self.assertEqual(results.count(None), threads - 1)
+        self.assertEqual(self.game.version, 1)
+
+    def test_go_to(self):
+        self.game.click(self.piece.q, self.piece.r, 0)
+        self.game.click(self.dest.q, self.dest.r, 1)
+        self.assertIsNone(self.game.go_to(0, 1))
+        self.assertIs(self.game.go_to(5, 2), False)
+        self.assertEqual(self.game.version, 2)
+        self.assertIs(self.game.go_to(0, 2), True)
+        self.assertEqual(self.game.version, 3)
+        self.assertEqual(self.game.board.turn, 0)
+        self.assertIsNotNone(self.game.board.get_hex(self.piece.q, self.piece.r).piece)
+        self.assertIs(self.game.go_to(1, 3), True)
+        self.assertIsNone(self.game.board.get_hex(self.piece.q, self.piece.r).piece)
+
+
+class GameRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = GameRegistry(max_games=3, idle_timeout=60)
+
+    def test_unknown_games_are_not_made(self):
+        self.assertIsNone(self.registry.get("unknown"))
+        self.assertNotIn("unknown", self.registry.games)
+        self.assertIsNotNone(self.registry.get(DEFAULT_GAME))
+
+    def test_full_registry_keeps_games_in_use(self):
+        first = self.registry.create()
+        second = self.registry.create()
+        self.assertIsNotNone(self.registry.create())
+        self.assertIsNone(self.registry.create())
+        self.assertIs(self.registry.get(first.id), first)
+        self.assertIs(self.registry.get(second.id), second)
+
+    def test_idle_games_make_room(self):
+        default = self.registry.get(DEFAULT_GAME)
+        idle = self.registry.create()
+        busy = self.registry.create()
+        for game in (default, idle, busy):
+            game.last_used -= 120
+        # asking for a game marks it as used again
+        self.registry.get(busy.id)
+        new = self.registry.create()
+        self.assertIsNotNone(new)
+        self.assertEqual(set(self.registry.games), {DEFAULT_GAME, busy.id, new.id})
+
+
+class GameViewTests(TestCase):
+    def test_unknown_game_is_404(self):
+        for path in ["", "history/", "history/0/", "analysis/"]:
+            response = self.client.get(f"/games/nosuchgame/{path}")
+            self.assertEqual(response.status_code, 404, path)
+        self.assertNotIn("nosuchgame", registry.games)
+
+    def test_new_game(self):
+        response = self.client.post("/games/new/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(response["Location"]).status_code, 200)
+
+    def test_garbled_version_is_stale(self):
+        game = registry.get(DEFAULT_GAME)
+        version = game.version
+        for path in ["click/", "takeback/"]:
+            response = self.client.post(f"/{path}", {"tile_id": "0 0", "version": "x"})
+            self.assertRedirects(response, f"/games/{DEFAULT_GAME}/")
+        self.assertEqual(game.version, version)
+
+
+ARCHIVE = """
+; a comment
+[Event "Club night"]
+[Result "1-0"]
+
+1. f5-f6 c7-c6 2. e4-e5
+1-0
+1. f5-f6 *
+[Event "No result"]
+1. e4-e5
+"""
+
+
+class NotationTests(TestCase):
+    def test_read_games(self):
+        games = list(read_games(ARCHIVE.splitlines()))
+        self.assertEqual(len(games), 3)
+        self.assertEqual(games[0].tags, {"Event": "Club night", "Result": "1-0"})
+        self.assertEqual(games[0].moves, ["f5-f6", "c7-c6", "e4-e5"])
+        self.assertEqual(games[0].result, "1-0")
+        self.assertEqual(games[0].line, 3)
+        self.assertEqual((games[1].moves, games[1].result), (["f5-f6"], "*"))
+        self.assertEqual(games[2].tags, {"Event": "No result"})
+        self.assertEqual(games[2].moves, ["e4-e5"])
+
+    def test_replay_legal_game(self):
+        board = Board()
+        self.assertIsNone(replay(board, ["f5-f6", "c7-c6", "e4-e5"]))
+        self.assertEqual(board.turn, 1)
+
+    def test_replay_reasons(self):
+        cases = [
+            (["f5-f6", "zz-f6"], 2, "is not a move"),
+            (["f6-f7"], 1, "no piece on f6"),
+            (["c7-c6"], 1, "moved out of turn"),
+            (["f5-f7"], 1, "can not move there"),
+            (["f5xf6"], 1, "nothing to capture"),
+        ]
+        for moves, ply, reason in cases:
+            failed = replay(Board(), moves)
+            self.assertEqual(failed[:2], (ply, moves[-1]), moves)
+            self.assertIn(reason, failed[2], moves)
+
+    def test_replay_checks(self):
+        state = {
+            (0, -3): ("K", 0),
+            (0, -1): ("R", 0),
+            (0, 3): ("R", 1),
+            (4, 0): ("K", 1),
+        }
+        # the rook is pinned to its king
+        pinned = [move_name((0, -1), (1, -1))]
+        failed = replay(Board(initial_state=state), pinned)
+        self.assertIn("leaves its king in check", failed[2])
+        unmarked = [move_name((0, -1), (0, 3))]
+        failed = replay(Board(initial_state=state), unmarked)
+        self.assertIn("not marked with x", failed[2])
+        marked = [move_name((0, -1), (0, 3), capture=True)]
+        self.assertIsNone(replay(Board(initial_state=state), marked))
+
+    def test_import_rejects_bad_batch_size(self):
+        with self.assertRaises(CommandError):
+            call_command("import_games", "-", "--batch-size", "0")
+
+
+def transformed_board(board, transform):
+    """
+    A copy of the board moved through the transform, colors and side to
+    move swapped if the transform swaps them
+    """
+    state = {}
+    for (q, r), (piece_type, color) in board.to_state().items():
+        if transform.swaps_colors:
+            color = 1 - color
+        state[transform(q, r)] = (piece_type, color)
+    copy = Board(initial_state=state, variant=board.variant)
+    copy.turn = 1 - board.turn if transform.swaps_colors else board.turn
+    return copy
+
+
+class SymmetryTests(TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.assertTrue(self.board.play_move((0, -1), (0, 0)))
+
+    def test_transforms_are_their_own_inverse(self):
+        move = ((0, -1), (2, -2))
+        for transform in TRANSFORMS:
+            self.assertEqual(
+                transform_move(transform_move(move, transform), transform), move
+            )
+
+    def test_symmetric_positions_share_a_key(self):
+        key, _ = canonical_key(self.board)
+        for transform in valid_transforms(self.board.variant):
+            copy = transformed_board(self.board, transform)
+            self.assertEqual(canonical_key(copy)[0], key, transform)
+
+    def test_results_map_between_symmetric_boards(self):
+        rotated = transformed_board(self.board, ROTATE)
+        key, transform = canonical_key(self.board)
+        # a result found on the original board, black to move
+        fro, to = movable_piece(self.board)
+        job = AnalysisJob(key, transform, None)
+        job.info = {
+            "depth": 1,
+            "score": 50,
+            "line": [((fro.q, fro.r), (to.q, to.r))],
+            "nodes": 1,
+        }
+        rotated_key, rotated_transform = canonical_key(rotated)
+        self.assertEqual(rotated_key, key)
+        info = job.as_json(rotated_transform)
+        # the rotated board has the colors swapped, so the score flips
+        self.assertEqual(info["score"], -50)
+        # and the move leads to the same position up to symmetry
+        self.board.play_move((fro.q, fro.r), (to.q, to.r))
+        self.assertTrue(rotated.play_move(*info["line"][0]))
+        self.assertEqual(canonical_key(rotated)[0], canonical_key(self.board)[0])
+        # asked from the searched board nothing changes
+        self.assertEqual(job.as_json(transform)["score"], 50)
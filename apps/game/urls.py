@@ -1,11 +1,23 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 app_name = "game"
 
-urlpatterns = [
+game_patterns = [
     path("", views.board_view, name="game_page"),
     path("click/", views.on_click, name="click"),
     path("reset/", views.reset_board, name="reset"),
     path("flip/", views.flip_board, name="flip"),
+    path("analysis/", views.analysis, name="analysis"),
+    path("takeback/", views.takeback, name="takeback"),
+    path("redo/", views.redo, name="redo"),
+    path("jump/<int:ply>/", views.jump, name="jump"),
+    path("history/", views.history, name="history"),
+    path("history/<int:ply>/", views.history_position, name="history_position"),
+]
+
+# the root urls play the default game, games/<id>/ any other
+urlpatterns = game_patterns + [
+    path("games/new/", views.new_game, name="new_game"),
+    path("games/<slug:game_id>/", include(game_patterns)),
 ]
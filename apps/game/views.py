@@ -1,41 +1,209 @@
-from django.http import HttpResponse, HttpResponseRedirect
-from django.urls import reverse
+import hashlib
+
+from django.core.cache import caches
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.template import loader
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
-from engine.board import Board
+from .analysis import service as analysis_service
+from .games import DEFAULT_GAME, registry
 
 # Create your views here.
 
-board = Board()
+# rendered svg fragments, keyed by fragment_key
+fragment_cache = caches["board_fragments"]
+
+
+def get_game(game_id):
+    """
+    The game with the given id, 404 if there is none. Only new_game makes
+    games, so no request can fill the registry by asking for made up ids.
+    """
+    game = registry.get(game_id)
+    if game is None:
+        raise Http404(f"no game {game_id}")
+    return game
 
 
-def board_view(request):
+def fragment_key(board, flipped):
+    """
+    Hash of everything the rendered svg depends on: the position,
+    whether the board is flipped and which hex (if any) is selected.
+    """
+    selected = board.selected_hex
+    selection = f"{selected.q},{selected.r}" if selected else "-"
+    key = f"{board.position_key()}|{int(flipped)}|{selection}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def board_etag(request, game_id=DEFAULT_GAME):
+    """
+    The fragment key plus the game version, which the page embeds in the
+    click form so it has to change the ETag too
+    """
+    game = get_game(game_id)
     flipped = request.session.get("flipped", False)
+    with game.lock:
+        key = fragment_key(game.board, flipped)
+        version = game.version
+    return hashlib.sha1(f"{key}|{version}".encode()).hexdigest()
+
+
+def render_board_svg(game, flipped):
+    """
+    Returns the rendered svg for the game's board along with the version
+    and side to move it shows, rendering it only if this exact state is not already cached.
+    Only reading the board happens under the game's lock.
+    """
+    with game.lock:
+        version = game.version
+        turn = game.board.turn
+        key = fragment_key(game.board, flipped)
+        board_svg = fragment_cache.get(key)
+        if board_svg is None:
+            tiles = game.board.as_json(flipped)
+    if board_svg is None:
+        template = loader.get_template("game/board_svg.html")
+        board_svg = template.render({"board": tiles})
+        fragment_cache.set(key, board_svg)
+    return board_svg, version, turn
+
+
+def posted_version(request) -> int:
+    """
+    The game version the posting page was showing. Missing or garbled
+    versions come back as -1, which no game has, so they count as stale.
+    """
+    try:
+        return int(request.POST.get("version", -1))
+    except ValueError:
+        return -1
+
+
+def redirect_to(name, game_id):
+    return HttpResponseRedirect(reverse(name, kwargs={"game_id": game_id}))
+
+
+# no_cache makes the browser revalidate every load, which the etag turns into a 304
+@cache_control(no_cache=True)
+@condition(etag_func=board_etag)
+def board_view(request, game_id=DEFAULT_GAME):
+    game = get_game(game_id)
+    flipped = request.session.get("flipped", False)
+    board_svg, version, turn = render_board_svg(game, flipped)
     template = loader.get_template("game/board.html")
     context = {
-        "board": board.as_json(flipped),
-        "turn": "White" if board.turn == 0 else "Black",
+        "game_id": game.id,
+        "version": version,
+        "board_svg": board_svg,
+        "turn": "White" if turn == 0 else "Black",
     }
     return HttpResponse(template.render(context, request))
 
 
-def on_click(request):
+def on_click(request, game_id=DEFAULT_GAME):
     if request.method == "POST":
+        game = get_game(game_id)
         tile_id = request.POST.get("tile_id").split()
-        if board.on_click(int(tile_id[0]), int(tile_id[1])):
-            return HttpResponseRedirect(reverse("game:flip"))
+        version = posted_version(request)
+        moved = game.click(int(tile_id[0]), int(tile_id[1]), version)
+        # a stale click (moved is None) is dropped and the page reloaded
+        if moved:
+            return redirect_to("game:flip", game_id)
         else:
-            return HttpResponseRedirect(reverse("game:game_page"))
+            return redirect_to("game:game_page", game_id)
+
 
+def takeback(request, game_id=DEFAULT_GAME):
+    return go_to_ply(request, game_id, -1)
 
-def reset_board(request):
+
+def redo(request, game_id=DEFAULT_GAME):
+    return go_to_ply(request, game_id, 1)
+
+
+def jump(request, ply, game_id=DEFAULT_GAME):
+    return go_to_ply(request, game_id, ply, relative=False)
+
+
+def go_to_ply(request, game_id, ply, relative=True):
     if request.method == "POST":
-        board.__init__()
+        game = get_game(game_id)
+        version = posted_version(request)
+        if relative:
+            ply += game.history.ply
+        # stale or out of range requests just reload the page
+        game.go_to(ply, version)
+        return redirect_to("game:game_page", game_id)
+
+
+def history(request, game_id=DEFAULT_GAME):
+    """
+    The moves played so far and which ply the board is showing
+    """
+    game = get_game(game_id)
+    with game.lock:
+        return JsonResponse(
+            {
+                "ply": game.history.ply,
+                "plies": len(game.history.moves),
+                "moves": game.history.moves,
+            }
+        )
+
+
+def history_position(request, ply, game_id=DEFAULT_GAME):
+    """
+    The position after the given number of plies
+    """
+    game = get_game(game_id)
+    with game.lock:
+        if not 0 <= ply < len(game.history.positions):
+            raise Http404(f"game {game_id} has no ply {ply}")
+        position = game.history.positions[ply]
+    return JsonResponse({"ply": ply, **position.as_json()})
+
+
+def reset_board(request, game_id=DEFAULT_GAME):
+    if request.method == "POST":
+        get_game(game_id).reset()
         request.session["flipped"] = False
-        return HttpResponseRedirect(reverse("game:game_page"))
+        return redirect_to("game:game_page", game_id)
+
+
+def new_game(request):
+    """
+    Starts a game under a new id and goes to it
+    """
+    if request.method == "POST":
+        game = registry.create()
+        if game is None:
+            return HttpResponse("Too many games in play, try again later", status=503)
+        return redirect_to("game:game_page", game.id)
+    return redirect_to("game:game_page", DEFAULT_GAME)
 
 
-def flip_board(request):
+def flip_board(request, game_id=DEFAULT_GAME):
     flipped = request.session.get("flipped", False)
     request.session["flipped"] = not flipped
-    return HttpResponseRedirect(reverse("game:game_page"))
+    return redirect_to("game:game_page", game_id)
+
+
+def analysis(request, game_id=DEFAULT_GAME):
+    """
+    Starts (or joins) the analysis of the current position and returns
+    its latest progress. Cheap enough to be polled by every spectator.
+    When the analysis queue is full nothing is started and the reply
+    says busy, so the page just polls again later.
+    """
+    game = get_game(game_id)
+    with game.lock:
+        job, transform = analysis_service.submit(game.board)
+    if job is None:
+        return JsonResponse(
+            {"busy": True, "done": False, "depth": 0, "score": None, "line": []},
+            status=503,
+        )
+    return JsonResponse(job.as_json(transform))
@@ -0,0 +1,54 @@
+"""
+How board construction, move generation and rendering scale with the
+board radius. Run from the repository root with
+
+    python -m benchmarks.board_scaling
+
+The "linear lookup" column is what finding every hex cost before the
+per-radius tables, when get_hex scanned the whole board.
+"""
+
+import time
+
+from engine.board import Board
+from engine.search import generate_moves
+from engine.variant import VARIANTS
+
+
+def timed(func, repeat: int) -> float:
+    """
+    Average milliseconds per call
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def linear_lookup(board):
+    for tile in board.hexes:
+        for other in board.hexes:
+            if other.q == tile.q and other.r == tile.r:
+                break
+
+
+def main():
+    print(
+        f"{'variant':<12} {'hexes':>6} {'build ms':>9} {'movegen ms':>11} "
+        f"{'render ms':>10} {'lookup ms':>10} {'linear lookup ms':>17}"
+    )
+    for key, variant in VARIANTS.items():
+        board = Board(variant=variant)
+        build = timed(lambda: Board(variant=variant), 20)
+        movegen = timed(lambda: generate_moves(board), 20)
+        render = timed(lambda: board.as_json(False), 20)
+        lookup = timed(lambda: [board.get_hex(t.q, t.r) for t in board.hexes], 20)
+        linear = timed(lambda: linear_lookup(board), 20)
+        print(
+            f"{key:<12} {len(board.hexes):>6} {build:>9.3f} {movegen:>11.3f} "
+            f"{render:>10.3f} {lookup:>10.3f} {linear:>17.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
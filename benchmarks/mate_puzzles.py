@@ -0,0 +1,91 @@
+"""
+Mate puzzles for engine.solver, with how many nodes, how much table and
+memory and how long each takes to solve. Run from the repository root with
+
+    python -m benchmarks.mate_puzzles [--memory]
+
+--memory also measures peak memory with tracemalloc, which is slower.
+Positions use the START_STATE format, white to move in all of them.
+"""
+
+import sys
+
+from engine.solver import solve_state
+
+PUZZLES = [
+    {
+        "name": "queen to the corner",
+        "state": {
+            (-1, -3): ("K", 0),
+            (-5, 1): ("K", 1),
+            (-2, 3): ("Q", 0),
+            (1, -4): ("R", 0),
+        },
+        "mate_in": 1,
+    },
+    {
+        "name": "queen and rook ladder",
+        "state": {
+            (-1, 1): ("K", 0),
+            (-2, -1): ("K", 1),
+            (0, 4): ("Q", 0),
+            (-3, 5): ("R", 0),
+        },
+        "mate_in": 2,
+    },
+    {
+        "name": "two rooks past the knight",
+        "state": {
+            (2, -3): ("K", 0),
+            (5, -3): ("K", 1),
+            (2, 2): ("R", 0),
+            (1, -2): ("R", 0),
+            (0, -5): ("B", 0),
+            (1, 3): ("N", 1),
+        },
+        "mate_in": 2,
+    },
+    {
+        "name": "edge chase",
+        "state": {
+            (-1, -3): ("K", 0),
+            (4, 0): ("K", 1),
+            (-4, -1): ("Q", 0),
+            (-3, 5): ("R", 0),
+        },
+        "mate_in": 3,
+    },
+    {
+        "name": "lone rook, no quick mate",
+        "state": {
+            (0, -2): ("K", 0),
+            (0, 3): ("K", 1),
+            (3, -1): ("R", 0),
+        },
+        "mate_in": None,
+    },
+]
+
+
+def main():
+    measure_memory = "--memory" in sys.argv
+    print(
+        f"{'puzzle':<26} {'expected':>8} {'found':>6} {'nodes':>7} "
+        f"{'table':>7} {'peak KiB':>9} {'seconds':>8}"
+    )
+    for puzzle in PUZZLES:
+        max_moves = puzzle["mate_in"] or 2
+        result = solve_state(
+            puzzle["state"], 0, max_moves, measure_memory=measure_memory
+        )
+        memory = result.get("peak_memory")
+        memory = f"{memory / 1024:.0f}" if memory else "-"
+        print(
+            f"{puzzle['name']:<26} {puzzle['mate_in'] or '-':>8} "
+            f"{result['mate_in'] or '-':>6} {result['nodes']:>7} "
+            f"{result['peak_table_entries']:>7} {memory:>9} {result['seconds']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,14 @@
-import math
-
 from .hex import Hex
 from .piece import make_piece, Rook, Knight, Bishop, Queen, King, Pawn
+from .tables import board_tables, hex_geometry
+from .variant import VARIANTS, Variant, default_variant, empty_variant
 
 """
-Represents the start state as a list of pieces on the board at the start
-each piece is represented as (q, r, s, type, color)
+Represents the start state as a dict of the pieces on the board at the start
+each piece is represented as (q, r): (type, color)
+Other setups and board sizes are in variant.VARIANTS
 """
-START_STATE = {
-    # white pieces
-    (-4, -1): ("P", 0),
-    (-3, -1): ("P", 0),
-    (-2, -1): ("P", 0),
-    (-1, -1): ("P", 0),
-    (0, -1): ("P", 0),
-    (1, -2): ("P", 0),
-    (2, -3): ("P", 0),
-    (3, -4): ("P", 0),
-    (4, -5): ("P", 0),
-    (1, -5): ("K", 0),
-    (-1, -4): ("Q", 0),
-    (0, -5): ("B", 0),
-    (0, -4): ("B", 0),
-    (0, -3): ("B", 0),
-    (3, -5): ("R", 0),
-    (-3, -2): ("R", 0),
-    (-2, -3): ("N", 0),
-    (2, -5): ("N", 0),
-    # black pieces
-    (0, 1): ("P", 1),
-    (1, 1): ("P", 1),
-    (2, 1): ("P", 1),
-    (3, 1): ("P", 1),
-    (4, 1): ("P", 1),
-    (-1, 2): ("P", 1),
-    (-2, 3): ("P", 1),
-    (-3, 4): ("P", 1),
-    (-4, 5): ("P", 1),
-    (1, 4): ("K", 1),
-    (-1, 5): ("Q", 1),
-    (0, 5): ("B", 1),
-    (0, 4): ("B", 1),
-    (0, 3): ("B", 1),
-    (-3, 5): ("R", 1),
-    (3, 2): ("R", 1),
-    (2, 3): ("N", 1),
-    (-2, 5): ("N", 1),
-}
+START_STATE = VARIANTS["glinski"].start_state
 
 
 class Board:
@@ -56,25 +18,43 @@ class Board:
     Will contain a set of methods for finding adjacent hexes and such
     """
 
-    def __init__(self, radius: int = 5, initial_state=None, size=30, center=(400, 400)):
+    def __init__(
+        self,
+        radius: int = 5,
+        initial_state=None,
+        size=30,
+        center=(400, 400),
+        variant: Variant = None,
+    ):
+        """
+        The variant decides the start state and which hexes pawns can double
+        step from. If it is not given, the Gliński setup for the radius is used,
+        or an empty variant if the position is given and Gliński's does not fit.
+        """
         self.size = None
+        if variant is None:
+            if initial_state is not None and radius < 5:
+                variant = empty_variant(radius)
+            else:
+                variant = default_variant(radius)
+        self.variant = variant
+        self.radius = variant.radius
         if initial_state is None:
-            initial_state = START_STATE
+            initial_state = variant.start_state
+        # shared lookup tables for every board of this radius
+        self.tables = board_tables(self.radius)
 
         hexes = []
-        for q in range(-radius, radius + 1):
-            for r in range(-radius, radius + 1):
-                s = -q + -r
-                if -radius <= s <= radius:
-                    # piece is none by default
-                    piece = None
-                    # get if there is a piece on the hex
-                    key = (q, r)
-                    if key in initial_state:
-                        piece_type, color = initial_state[key]
-                        piece = make_piece(piece_type, color)
-                    color = (r - q) % 3
-                    hexes.append(Hex(q, r, s, piece, color))
+        for q, r in self.tables.coords:
+            # piece is none by default
+            piece = None
+            # get if there is a piece on the hex
+            key = (q, r)
+            if key in initial_state:
+                piece_type, color = initial_state[key]
+                piece = make_piece(piece_type, color)
+            color = (r - q) % 3
+            hexes.append(Hex(q, r, -q + -r, piece, color))
         self.hexes = hexes
         self.board_center = center
         self.set_size(size)
@@ -94,7 +74,7 @@ class Board:
                 self.__unselect_piece()
                 self.move_piece(tile, (q, r))
                 self.__next_turn()
-                return True # return true since we changed turns
+                return True  # return true since we changed turns
             if not tile.piece:
                 self.__unselect_piece()
             # if we clicked on another owned piece, select it instead
@@ -109,7 +89,7 @@ class Board:
         # if we don't have a selected hex, and the hex we clicked on is selectable, select it
         elif tile.piece and tile.piece.color == self.turn:
             self.__select_piece(q, r)
-        return False # return false since we did not change turns
+        return False  # return false since we did not change turns
 
     def __unselect_piece(self):
         self.selected_hex.selected = False
@@ -128,10 +108,40 @@ class Board:
         Returns the hex at the given q, r coordinate,
         or None if it is out of bounds.
         """
-        for hex in self.hexes:
-            if hex.q == q and hex.r == r:
-                return hex
-        return None
+        i = self.tables.index.get((q, r))
+        if i is None:
+            return None
+        return self.hexes[i]
+
+    def position_key(self) -> str:
+        """
+        Returns a compact string identifying the position, one character per
+        hex (uppercase white, lowercase black, "." for empty) followed by the
+        side to move. Boards with equal keys hold the same position.
+        """
+        cells = "".join(tile.piece.letter if tile.piece else "." for tile in self.hexes)
+        return f"{cells}{'w' if self.turn == 0 else 'b'}"
+
+    def to_state(self) -> dict:
+        """
+        Returns the pieces on the board in the same format as START_STATE
+        """
+        return {
+            (tile.q, tile.r): (tile.piece.letter.upper(), tile.piece.color)
+            for tile in self.hexes
+            if tile.piece
+        }
+
+    def copy(self):
+        """
+        Returns a new board with the same pieces and side to move,
+        but nothing selected. Safe to hand to another thread.
+        """
+        board = Board(
+            self.radius, self.to_state(), self.size, self.board_center, self.variant
+        )
+        board.turn = self.turn
+        return board
 
     def __next_turn(self):
         self.turn = 1 if self.turn == 0 else 0
@@ -163,67 +173,13 @@ class Board:
                 )
 
     def __get_moves_rook(self, q, r, color):
-        out = []
-        # movement along files
-        directions = [(0, 1), (1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1)]
-        # for each file
-        for move in directions:
-            # keep going until we hit the border or a piece
-            dest: Hex = self.get_hex(q + move[0], r + move[1])
-            while dest:
-                if not dest.piece:
-                    out.append(dest)
-                else:
-                    if dest.piece.color != color:
-                        out.append(dest)
-                    break
-                dest = self.get_hex(dest.q + move[0], dest.r + move[1])
-        return out
+        return self.__get_moves_sliding(self.tables.rook_rays, q, r, color)
 
-    def __get_moves_knight(self, q, r, color) -> list[tuple[int, int]]:
-        out = []
-        directions = [
-            (2, 1),
-            (3, -1),
-            (3, -2),
-            (2, -3),
-            (1, -3),
-            (-1, -2),
-            (-2, -1),
-            (-3, 1),
-            (-2, 3),
-            (-3, 2),
-            (-1, 3),
-            (1, 2),
-        ]
-        # just check the exact hexes we could move to
-        for move in directions:
-            dest: Hex = self.get_hex(q + move[0], r + move[1])
-            if dest:
-                if not dest.piece or dest.piece.color != color:
-                    out.append(dest)
-        return out
+    def __get_moves_knight(self, q, r, color) -> list[Hex]:
+        return self.__get_moves_stepping(self.tables.knight_steps, q, r, color)
 
     def __get_moves_bishop(self, q, r, color):
-        out = []
-        directions = [(1, 1), (-1, 2), (-2, 1), (-1, -1), (1, -2), (2, -1)]
-        # for each diagonal
-        for move in directions:
-            # keep going until we hit the border or a piece
-            dest: Hex = self.get_hex(q + move[0], r + move[1])
-            while dest:
-                # if there is no piece there, add the hex
-                if not dest.piece:
-                    out.append(dest)
-                # if there is a piece but its not ours, add the hex
-                else:
-                    if dest.piece.color != color:
-                        out.append(dest)
-                    # break cuz we hit a piece
-                    break
-                # go to next hex
-                dest = self.get_hex(dest.q + move[0], dest.r + move[1])
-        return out
+        return self.__get_moves_sliding(self.tables.bishop_rays, q, r, color)
 
     def __get_moves_queen(self, q, r, color):
         # just combine the rook and bishop
@@ -234,99 +190,62 @@ class Board:
 
     def __get_moves_king(self, q, r, color):
         out = []
-        directions = [
-            (0, 1),
-            (1, 0),
-            (1, -1),
-            (0, -1),
-            (-1, 0),
-            (-1, 1),
-            (1, 1),
-            (-1, 2),
-            (-2, 1),
-            (-1, -1),
-            (1, -2),
-            (2, -1),
-        ]
-        # check each direction
-        for move in directions:
-            dest: Hex = self.get_hex(q + move[0], r + move[1])
-            # if the destination is in bounds and no piece there, add it the hex
-            # if there is an enemy piece, add it
-            if dest:
-                if self.__is_under_threat(dest.q, dest.r, color):
-                    continue
+        # check each step, skipping hexes the king would be attacked on
+        for dest in self.__get_moves_stepping(self.tables.king_steps, q, r, color):
+            if not self.__is_under_threat(dest.q, dest.r, color):
+                out.append(dest)
+        return out
+
+    def __get_moves_pawn(self, q, r, color):
+        """TODO: implement en passant is we i want to"""
+        out = []
+        i = self.tables.index[(q, r)]
+        # moving forward, white towards +r and black towards -r
+        forward = self.tables.pawn_forward[color]
+        j = forward[i]
+        if j is not None and not self.hexes[j].piece:
+            out.append(self.hexes[j])
+            # two hexes from the hex the pawn started on
+            j = forward[j]
+            if (
+                (q, r) in self.variant.pawn_start_hexes[color]
+                and j is not None
+                and not self.hexes[j].piece
+            ):
+                out.append(self.hexes[j])
+
+        # check for taking
+        for j in self.tables.pawn_captures[color][i]:
+            dest = self.hexes[j]
+            if dest.piece and dest.piece.color != color:
+                out.append(dest)
+        return out
+
+    def __get_moves_sliding(self, rays, q, r, color):
+        out = []
+        # for each direction
+        for ray in rays[self.tables.index[(q, r)]]:
+            # keep going until we hit the border or a piece
+            for j in ray:
+                dest = self.hexes[j]
+                # if there is no piece there, add the hex
                 if not dest.piece:
                     out.append(dest)
                     continue
+                # if there is a piece but its not ours, add the hex
                 if dest.piece.color != color:
                     out.append(dest)
+                # break cuz we hit a piece
+                break
         return out
 
-    def __get_moves_pawn(self, q, r, color):
-        """TODO: implement en passant is we i want to"""
-        white_start_hexes = [
-            (-4, -1),
-            (-3, -1),
-            (-2, -1),
-            (-1, -1),
-            (0, -1),
-            (1, -2),
-            (2, -3),
-            (3, -4),
-            (4, -5),
-        ]
-        black_start_hexes = [
-            (0, 1),
-            (1, 1),
-            (2, 1),
-            (3, 1),
-            (4, 1),
-            (-1, 2),
-            (-2, 3),
-            (-3, 4),
-            (-4, 5),
-        ]
+    def __get_moves_stepping(self, steps, q, r, color):
         out = []
-        # if white pawn
-        if color == 0:
-            # moving forward
-            dest: Hex = self.get_hex(q, r + 1)
-            if dest and not dest.piece:
-                out.append(dest)
-                if (q, r) in white_start_hexes:
-                    dest = self.get_hex(q, r + 2)
-                    if not dest.piece:
-                        out.append(dest)
-
-            # check for taking
-            dest = self.get_hex(q + 1, r)
-            if dest and dest.piece and dest.piece.color != color:
-                out.append(dest)
-            dest = self.get_hex(q - 1, r + 1)
-            if dest and dest.piece and dest.piece.color != color:
-                out.append(dest)
-
-        # if black pawn
-        if color == 1:
-            # moving forward
-            dest: Hex = self.get_hex(q, r - 1)
-            if dest and not dest.piece:
-                out.append(dest)
-                if (q, r) in black_start_hexes:
-                    dest = self.get_hex(q, r - 2)
-                    if not dest.piece:
-                        out.append(dest)
-
-            # check for taking
-            # check for taking
-            dest = self.get_hex(q - 1, r)
-            if dest and dest.piece and dest.piece.color != color:
-                out.append(dest)
-            dest = self.get_hex(q + 1, r - 1)
-            if dest and dest.piece and dest.piece.color != color:
+        # just check the exact hexes we could move to
+        for j in steps[self.tables.index[(q, r)]]:
+            dest = self.hexes[j]
+            if not dest.piece or dest.piece.color != color:
                 out.append(dest)
-
         return out
 
     def __is_under_threat(self, q, r, color):
@@ -366,6 +285,25 @@ class Board:
 
         return False
 
+    def in_check(self, color: int) -> bool:
+        """
+        Returns true if the king of the given color is attacked
+        """
+        for tile in self.hexes:
+            if type(tile.piece) is King and tile.piece.color == color:
+                break
+        else:
+            return False
+        if self.__is_under_threat(tile.q, tile.r, color):
+            return True
+        # __is_under_threat does not look for the other king
+        for dest in self.__get_moves_stepping(
+            self.tables.king_steps, tile.q, tile.r, color
+        ):
+            if type(dest.piece) is King:
+                return True
+        return False
+
     def move_piece(self, fro: tuple, to: tuple):
         """
         Move a piece from hex_start to hex_end. returns true if valid and false otherwise
@@ -380,43 +318,32 @@ class Board:
         hex_start.set_piece(None)
         return True
 
+    def play_move(self, fro: tuple, to: tuple) -> bool:
+        """
+        Plays a move for the side to move and swaps turns.
+        Returns false, leaving the board untouched, if the move is not legal
+        """
+        hex_start = self.get_hex(fro[0], fro[1])
+        if not hex_start or not hex_start.piece or hex_start.piece.color != self.turn:
+            return False
+        if not self.get_hex(to[0], to[1]) or not self.move_piece(fro, to):
+            return False
+        self.__next_turn()
+        return True
+
     def set_size(self, new_size: int):
         self.size = new_size
-        for tile in self.hexes:
-            self.__calculate_points(tile)
-
-    def __calculate_points(self, tile: Hex):
-        sqrt3 = math.sqrt(3)
-        # First calculate the center of a hex
-        center_x = self.board_center[0] + 1.5 * self.size * tile.q
-        center_y = self.board_center[1] - sqrt3 * self.size * (tile.r + tile.q / 2)
-        # calculate the points, self.size is the distance from the center
-        points = []
-        for i in range(6):
-            angle = i * math.pi / 3
-            points.append(
-                f"{center_x + self.size * math.cos(angle)},\
-                          {center_y + self.size * math.sin(angle)}"
-            )
-        tile.center_x = center_x
-        tile.center_y = center_y
-        tile.points = " ".join(points)
-        
-        # repeat with flipped board
-        # calculate center of hex
-        center_x_flip = self.board_center[0] - 1.5 * self.size * tile.q
-        center_y_flip = self.board_center[1] + sqrt3 * self.size * (tile.r + tile.q / 2)
-        # calculate points, with self.size as distance from center
-        points_flipped = []
-        for i in range(6):
-            angle = i * math.pi / 3
-            points_flipped.append(
-                f"{center_x_flip + self.size * math.cos(angle)},\
-                          {center_y_flip + self.size * math.sin(angle)}"
-            )
-        tile.center_x_flip = center_x_flip
-        tile.center_y_flip = center_y_flip
-        tile.points_flipped = " ".join(points_flipped)
+        # the geometry is shared by every board with the same radius, size and center
+        geometry = hex_geometry(self.radius, new_size, tuple(self.board_center))
+        for tile, points in zip(self.hexes, geometry):
+            (
+                tile.center_x,
+                tile.center_y,
+                tile.points,
+                tile.center_x_flip,
+                tile.center_y_flip,
+                tile.points_flipped,
+            ) = points
 
     def as_json(self, flipped):
         """
@@ -427,7 +354,7 @@ class Board:
             piece = tile.piece
             center_x = tile.center_x_flip if flipped else tile.center_x
             center_y = tile.center_y_flip if flipped else tile.center_y
-            x = center_x- self.size / 2
+            x = center_x - self.size / 2
             y = center_y - self.size / 2
             points = tile.points_flipped if flipped else tile.points
 
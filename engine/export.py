@@ -0,0 +1,183 @@
+"""
+Exports positions as fixed shape arrays for training, written to .npy
+shards that can be opened with np.load(path, mmap_mode="r") and streamed
+without loading them into memory.
+
+Each shard is a pair of files:
+    <name>.planes.npy  uint8 (positions, 12, cells), 1 where a piece is on a
+                       hex. Planes are PLANES in order, white then black, and
+                       cells follow the manifest's "coords".
+    <name>.meta.npy    int8 (positions, 2), the side to move (0 white, 1
+                       black) and the game result as in RESULT_CODES.
+manifest.json lists the shards and how many positions each holds.
+
+Needs numpy, installed with the "export" extra.
+"""
+
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+
+from .board import Board
+from .notation import move_name, parse_move
+from .search import generate_moves
+from .variant import VARIANTS
+
+PLANES = ["P", "N", "B", "R", "Q", "K"]
+# results from white's point of view, unfinished games are -2
+RESULT_CODES = {"1-0": 1, "0-1": -1, "1/2-1/2": 0, "*": -2}
+FORMAT_VERSION = 1
+
+
+def encode_position(board, planes):
+    """
+    Fills planes, a zeroed (12, cells) array, with the board's pieces
+    """
+    for i, tile in enumerate(board.hexes):
+        if tile.piece:
+            plane = PLANES.index(tile.piece.letter.upper())
+            planes[plane + 6 * tile.piece.color, i] = 1
+
+
+def positions_from_moves(variant_key: str, moves: list[str]):
+    """
+    Generator of every position of a stored game, from the start position
+    up to the last legal move
+    """
+    board = Board(variant=VARIANTS[variant_key])
+    yield board
+    for token in moves:
+        try:
+            fro, to = parse_move(token, board.radius)
+        except ValueError:
+            return
+        if not board.play_move(fro, to):
+            return
+        yield board
+
+
+def random_game(variant_key: str, seed: int, max_plies: int = 200):
+    """
+    Plays random moves from the start position, returns (moves, result).
+    The game ends when the side to move picks a move taking the king, which
+    wins like in engine.search. That move is left out, so every position of
+    the game still has both kings.
+    """
+    rnd = random.Random(seed)
+    board = Board(variant=VARIANTS[variant_key])
+    moves = []
+    for _ in range(max_plies):
+        options = generate_moves(board)
+        if not options:
+            return moves, "1/2-1/2"
+        fro, to = rnd.choice(options)
+        if to.piece is not None and to.piece.piece_type == "King":
+            return moves, "1-0" if board.turn == 0 else "0-1"
+        moves.append(
+            move_name((fro.q, fro.r), (to.q, to.r), board.radius, to.piece is not None)
+        )
+        board.play_move((fro.q, fro.r), (to.q, to.r))
+    return moves, "*"
+
+
+class ShardWriter:
+    """
+    Collects encoded positions and writes them out as memory mapped shards
+    of exactly shard_size positions, the last one holding whatever is left
+    over. Only the positions not yet written are kept in memory.
+    """
+
+    def __init__(self, out_dir: Path, name: str, shard_size: int):
+        self.out_dir = out_dir
+        self.name = name
+        self.shard_size = shard_size
+        self.parts = []
+        self.count = 0
+        self.shards = []
+
+    def add(self, planes, meta):
+        """
+        Adds a block of encoded positions, as returned by encode_games
+        """
+        self.parts.append((planes, meta))
+        self.count += len(planes)
+        while self.count >= self.shard_size:
+            self.__write(self.shard_size)
+
+    def flush(self):
+        if self.count:
+            self.__write(self.count)
+
+    def __write(self, size: int):
+        if len(self.parts) == 1:
+            planes, meta = self.parts[0]
+        else:
+            planes = np.concatenate([part[0] for part in self.parts])
+            meta = np.concatenate([part[1] for part in self.parts])
+        stem = f"{self.name}-{len(self.shards):05d}"
+        for suffix, buffer in (("planes", planes), ("meta", meta)):
+            out = np.lib.format.open_memmap(
+                self.out_dir / f"{stem}.{suffix}.npy",
+                mode="w+",
+                dtype=buffer.dtype,
+                shape=(size, *buffer.shape[1:]),
+            )
+            out[:] = buffer[:size]
+            out.flush()
+            del out
+        self.shards.append(
+            {
+                "planes": f"{stem}.planes.npy",
+                "meta": f"{stem}.meta.npy",
+                "positions": size,
+            }
+        )
+        self.parts = [(planes[size:], meta[size:])] if len(planes) > size else []
+        self.count -= size
+
+
+def encode_games(task: dict):
+    """
+    Worker for one chunk of games, run in its own process. The task gives
+    the variant and either "games" as (moves, result) pairs or "seeds" for
+    random games. Returns (planes, meta) arrays of every position, in the
+    shard layout.
+    """
+    variant_key = task["variant"]
+    cells = len(Board(variant=VARIANTS[variant_key]).hexes)
+    # grown by doubling, the number of positions is only known at the end
+    planes = np.zeros((1024, 12, cells), dtype=np.uint8)
+    meta = np.zeros((1024, 2), dtype=np.int8)
+    count = 0
+    games = task.get("games") or (
+        random_game(variant_key, seed) for seed in task.get("seeds", [])
+    )
+    for moves, result in games:
+        for board in positions_from_moves(variant_key, moves):
+            if count == len(planes):
+                planes = np.concatenate([planes, np.zeros_like(planes)])
+                meta = np.concatenate([meta, np.zeros_like(meta)])
+            encode_position(board, planes[count])
+            meta[count] = (board.turn, RESULT_CODES[result])
+            count += 1
+    return planes[:count], meta[:count]
+
+
+def write_manifest(out_dir: Path, variant_key: str, shards: list[dict]):
+    board = Board(variant=VARIANTS[variant_key])
+    manifest = {
+        "format": FORMAT_VERSION,
+        "variant": variant_key,
+        "radius": board.radius,
+        "cells": len(board.hexes),
+        "coords": board.tables.coords,
+        "planes": [f"{color}{piece}" for color in "wb" for piece in PLANES],
+        "result_codes": RESULT_CODES,
+        "positions": sum(shard["positions"] for shard in shards),
+        "shards": sorted(shards, key=lambda shard: shard["planes"]),
+    }
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,158 @@
+"""
+Move history kept as immutable positions. A position's cells are the leaves
+of a tree of tuples where every node has up to BRANCHING children, and
+playing a move only copies the nodes on the paths from the root down to the
+two hexes it touches; every other node is shared with the position before.
+Keeping a position for every ply therefore costs a few small tuples per ply
+instead of a copy of the whole board, however big the board is.
+"""
+
+from .board import Board
+from .tables import board_tables
+
+BRANCHING = 8
+
+
+def _tree_depth(size: int) -> int:
+    # levels needed for the leaves to hold size cells, at least one
+    depth = 1
+    while BRANCHING**depth < size:
+        depth += 1
+    return depth
+
+
+def _build(cells: list, depth: int) -> tuple:
+    if depth == 1:
+        return tuple(cells)
+    span = BRANCHING ** (depth - 1)
+    return tuple(
+        _build(cells[i : i + span], depth - 1) for i in range(0, len(cells), span)
+    )
+
+
+def _replace(node: tuple, i: int, value, depth: int) -> tuple:
+    # copies of the nodes on the path to leaf i, the rest is shared
+    span = BRANCHING ** (depth - 1)
+    c, j = divmod(i, span)
+    child = value if depth == 1 else _replace(node[c], j, value, depth - 1)
+    return node[:c] + (child,) + node[c + 1 :]
+
+
+def _leaves(node: tuple, depth: int):
+    if depth == 1:
+        yield from node
+    else:
+        for child in node:
+            yield from _leaves(child, depth - 1)
+
+
+class Position:
+    """
+    An immutable position: the piece letter on each hex (uppercase white,
+    lowercase black, None for empty) in board order, and the side to move
+    """
+
+    __slots__ = ("depth", "radius", "root", "turn")
+
+    def __init__(self, root: tuple, depth: int, turn: int, radius: int):
+        self.root = root
+        self.depth = depth
+        self.turn = turn
+        self.radius = radius
+
+    @classmethod
+    def from_board(cls, board):
+        cells = [tile.piece.letter if tile.piece else None for tile in board.hexes]
+        depth = _tree_depth(len(cells))
+        return cls(_build(cells, depth), depth, board.turn, board.radius)
+
+    def cell(self, i: int) -> str | None:
+        node = self.root
+        for level in range(self.depth - 1, -1, -1):
+            c, i = divmod(i, BRANCHING**level)
+            node = node[c]
+        return node
+
+    def cells(self):
+        """
+        Generator of every cell in board order
+        """
+        return _leaves(self.root, self.depth)
+
+    def move(self, fro: int, to: int):
+        """
+        Returns the position after moving the piece on hex index fro to to.
+        Only the nodes on the paths to fro and to are copied.
+        """
+        root = _replace(self.root, to, self.cell(fro), self.depth)
+        root = _replace(root, fro, None, self.depth)
+        return Position(root, self.depth, 1 - self.turn, self.radius)
+
+    def to_state(self) -> dict:
+        """
+        The pieces in the same format as START_STATE
+        """
+        state = {}
+        for coord, letter in zip(board_tables(self.radius).coords, self.cells()):
+            if letter:
+                state[coord] = (letter.upper(), 0 if letter.isupper() else 1)
+        return state
+
+    def to_board(self, variant=None):
+        board = Board(self.radius, self.to_state(), variant=variant)
+        board.turn = self.turn
+        return board
+
+    def as_json(self):
+        return {
+            "turn": self.turn,
+            "pieces": [
+                [q, r, letter]
+                for (q, r), letter in zip(
+                    board_tables(self.radius).coords, self.cells()
+                )
+                if letter
+            ],
+        }
+
+
+class History:
+    """
+    Every position of a game plus the moves between them, and which ply
+    is being shown. Going back and playing a new move drops the old future.
+    """
+
+    def __init__(self, position: Position):
+        self.positions = [position]
+        self.moves = []
+        self.ply = 0
+
+    @property
+    def current(self) -> Position:
+        return self.positions[self.ply]
+
+    def push(self, fro: tuple, to: tuple):
+        """
+        Records the move (from, to) played from the current position
+        """
+        index = board_tables(self.current.radius).index
+        del self.positions[self.ply + 1 :]
+        del self.moves[self.ply :]
+        self.positions.append(self.current.move(index[fro], index[to]))
+        self.moves.append((fro, to))
+        self.ply += 1
+
+    def jump(self, ply: int) -> bool:
+        """
+        Shows the position after ply moves, false if there is no such ply
+        """
+        if not 0 <= ply < len(self.positions):
+            return False
+        self.ply = ply
+        return True
+
+    def undo(self) -> bool:
+        return self.jump(self.ply - 1)
+
+    def redo(self) -> bool:
+        return self.jump(self.ply + 1)
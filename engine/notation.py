@@ -0,0 +1,156 @@
+"""
+Reading and writing hex chess games as text.
+
+Hexes are named the Gliński way: a file letter (a to l, skipping j, from
+white's left) followed by the rank counted up the file from white's edge,
+so white's king starts on g1 and black's on g10. Bigger boards carry on
+through the alphabet.
+
+A move is two hex names joined by "-", or by "x" for a capture, with an
+optional "+" or "#" on the end: f5-f6, g4xf6+.
+
+An archive holds any number of games one after another. Each game is
+optional [Tag "value"] lines followed by its moves, where move numbers
+("12." or "12...") are ignored and a result (1-0, 0-1, 1/2-1/2 or *)
+ends the game. Lines starting with ";" are comments. For example:
+
+    [Event "Club night"]
+    [Variant "glinski"]
+    [Result "1-0"]
+
+    1. f5-f6 c7-c6 2. e4-e5 d7-d6
+    1-0
+"""
+
+import re
+
+from .variant import rank_to_r
+
+FILE_LETTERS = "abcdefghiklmnopqrstuvwxyz"
+RESULTS = ["1-0", "0-1", "1/2-1/2", "*"]
+
+CELL_PATTERN = re.compile(r"^([a-z])(\d+)$")
+MOVE_PATTERN = re.compile(r"^([a-z]\d+)([-x])([a-z]\d+)[+#]?$")
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"(.*)"\]$')
+MOVE_NUMBER_PATTERN = re.compile(r"^\d+\.+$")
+
+
+def cell_name(q: int, r: int, radius: int = 5) -> str:
+    file = FILE_LETTERS[q + radius]
+    return f"{file}{r - rank_to_r(radius, q, 1) + 1}"
+
+
+def parse_cell(name: str, radius: int = 5) -> tuple[int, int]:
+    """
+    Returns the (q, r) of a hex name, raises ValueError if it is not on the board
+    """
+    match = CELL_PATTERN.match(name)
+    if not match or match.group(1) not in FILE_LETTERS[: 2 * radius + 1]:
+        raise ValueError(f"{name}: is not a hex")
+    q = FILE_LETTERS.index(match.group(1)) - radius
+    r = rank_to_r(radius, q, int(match.group(2)))
+    if int(match.group(2)) < 1 or r > radius or -q - r < -radius:
+        raise ValueError(f"{name}: is not a hex")
+    return q, r
+
+
+def parse_move(token: str, radius: int = 5) -> tuple[tuple, tuple]:
+    """
+    Returns the (from, to) coordinates of a move, raises ValueError if
+    it can not be read
+    """
+    match = MOVE_PATTERN.match(token)
+    if not match:
+        raise ValueError(f"{token}: is not a move")
+    return parse_cell(match.group(1), radius), parse_cell(match.group(3), radius)
+
+
+def move_name(fro: tuple, to: tuple, radius: int = 5, capture=False) -> str:
+    separator = "x" if capture else "-"
+    return f"{cell_name(*fro, radius)}{separator}{cell_name(*to, radius)}"
+
+
+class GameRecord:
+    """
+    A game as read from an archive, before any of its moves are checked
+    """
+
+    def __init__(self, line: int):
+        # line of the archive the game starts on, for error messages
+        self.line = line
+        self.tags = {}
+        self.moves = []
+        self.result = "*"
+
+    def __repr__(self):
+        return f"GameRecord: line {self.line}, {len(self.moves)} moves, {self.result}"
+
+
+def read_games(lines):
+    """
+    Generator of the GameRecords in an iterable of lines. Only the game
+    being read is held in memory, so archives of any size can be streamed.
+    """
+    game = None
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        tag = TAG_PATTERN.match(line)
+        if tag:
+            # tags after moves mean the last game had no result
+            if game is not None and game.moves:
+                yield game
+                game = None
+            if game is None:
+                game = GameRecord(number)
+            game.tags[tag.group(1)] = tag.group(2)
+            if tag.group(1) == "Result" and tag.group(2) in RESULTS:
+                game.result = tag.group(2)
+            continue
+        for token in line.split():
+            if MOVE_NUMBER_PATTERN.match(token):
+                continue
+            if game is None:
+                game = GameRecord(number)
+            if token in RESULTS:
+                game.result = token
+                yield game
+                game = None
+                continue
+            game.moves.append(token)
+    if game is not None and (game.moves or game.tags):
+        yield game
+
+
+def replay(board, moves: list[str]):
+    """
+    Plays the moves on the board. Returns None if they were all legal,
+    otherwise (ply, move, reason) for the first one that was not,
+    with ply counted from 1. A move has to use "x" exactly when it
+    captures, and may not leave the mover's own king attacked.
+    """
+    for ply, token in enumerate(moves, start=1):
+        try:
+            fro, to = parse_move(token, board.radius)
+        except ValueError as e:
+            return ply, token, str(e)
+        tile = board.get_hex(*fro)
+        if not tile.piece:
+            return ply, token, f"no piece on {cell_name(*fro, board.radius)}"
+        piece = tile.piece
+        if piece.color != board.turn:
+            return ply, token, f"{piece} moved out of turn"
+        # parse_move only accepts hexes on the board, so the target exists
+        occupied = board.get_hex(*to).piece is not None
+        # legality first, so an illegal move is reported as that
+        if not board.play_move(fro, to):
+            return ply, token, f"{piece} can not move there"
+        capture = MOVE_PATTERN.match(token).group(2) == "x"
+        if capture and not occupied:
+            return ply, token, "nothing to capture"
+        if occupied and not capture:
+            return ply, token, "capture not marked with x"
+        if board.in_check(piece.color):
+            return ply, token, f"{piece} leaves its king in check"
+    return None
@@ -19,6 +19,15 @@ VALID_TYPES = [
     "p",
 ]
 
+PIECE_LETTERS = {
+    "Rook": "R",
+    "Knight": "N",
+    "Bishop": "B",
+    "Queen": "Q",
+    "King": "K",
+    "Pawn": "P",
+}
+
 
 class Piece:
     """
@@ -31,6 +40,10 @@ class Piece:
         self.piece_type = covert_piece_to_string(piece_type)
         self.color = color
         self.color_string = "White" if color == 0 else "Black"
+        # single letter code, uppercase for white and lowercase for black
+        self.letter = PIECE_LETTERS[self.piece_type]
+        if color == 1:
+            self.letter = self.letter.lower()
         # self.image_ref = "game/assets/"
         self.image_ref = "w_" if color == 0 else "b_"
 
@@ -0,0 +1,136 @@
+"""
+Simple material based alpha-beta search used for analysing positions.
+Moves are generated with Board.get_legal_moves, so a king may be left in
+check; capturing the enemy king is scored as a mate instead.
+"""
+
+from .board import Board
+from .hex import Hex
+
+PIECE_VALUES = {
+    "Pawn": 100,
+    "Knight": 300,
+    "Bishop": 325,
+    "Rook": 500,
+    "Queen": 900,
+    "King": 0,
+}
+MATE_SCORE = 100000
+
+
+def evaluate(board) -> int:
+    """
+    Material balance from the point of view of the side to move
+    """
+    score = 0
+    for tile in board.hexes:
+        if tile.piece:
+            value = PIECE_VALUES[tile.piece.piece_type]
+            score += value if tile.piece.color == board.turn else -value
+    return score
+
+
+def generate_moves(board) -> list[tuple[Hex, Hex]]:
+    """
+    All (from, to) hex pairs the side to move can play, captures first
+    """
+    moves = []
+    for tile in board.hexes:
+        if tile.piece and tile.piece.color == board.turn:
+            for dest in board.get_legal_moves(tile.q, tile.r):
+                moves.append((tile, dest))
+    moves.sort(key=_capture_order)
+    return moves
+
+
+def _capture_order(move):
+    # most valuable victim first, king captures before everything
+    victim = move[1].piece
+    if not victim:
+        return 0
+    if victim.piece_type == "King":
+        return -MATE_SCORE
+    return -PIECE_VALUES[victim.piece_type]
+
+
+def make_move(board, fro: Hex, to: Hex):
+    """
+    Plays a move without any legality checks, returns the captured piece
+    so the move can be undone with unmake_move
+    """
+    captured = to.piece
+    to.set_piece(fro.piece)
+    fro.set_piece(None)
+    board.turn = 1 - board.turn
+    return captured
+
+
+def unmake_move(board, fro: Hex, to: Hex, captured):
+    board.turn = 1 - board.turn
+    fro.set_piece(to.piece)
+    to.set_piece(captured)
+
+
+def negamax(board, depth: int, alpha: int, beta: int, stats: dict):
+    """
+    Returns (score, line) for the side to move, where line is the list
+    of (from, to) coordinate pairs of the principal variation
+    """
+    stats["nodes"] += 1
+    if depth == 0:
+        return evaluate(board), []
+
+    moves = generate_moves(board)
+    if not moves:
+        return 0, []
+
+    best_line = []
+    for fro, to in moves:
+        move = ((fro.q, fro.r), (to.q, to.r))
+        if to.piece and to.piece.piece_type == "King":
+            return MATE_SCORE, [move]
+        captured = make_move(board, fro, to)
+        score, line = negamax(board, depth - 1, -beta, -alpha, stats)
+        unmake_move(board, fro, to, captured)
+        score = -score
+        if score > alpha:
+            alpha = score
+            best_line = [move] + line
+        if alpha >= beta:
+            break
+    return alpha, best_line
+
+
+def analyse(board, max_depth: int, on_progress=None) -> dict:
+    """
+    Iterative deepening search of the board's position. After every
+    completed depth on_progress is called with a dict of depth, score
+    (from white's point of view), best line and node count.
+    The board is searched in place, so pass a copy if it is shared.
+    """
+    stats = {"nodes": 0}
+    info = None
+    for depth in range(1, max_depth + 1):
+        score, line = negamax(board, depth, -MATE_SCORE - 1, MATE_SCORE + 1, stats)
+        info = {
+            "depth": depth,
+            "score": score if board.turn == 0 else -score,
+            "line": line,
+            "nodes": stats["nodes"],
+        }
+        if on_progress:
+            on_progress(info)
+        # no point searching deeper once a mate is found
+        if abs(score) == MATE_SCORE:
+            break
+    return info
+
+
+def analyse_state(state: dict, turn: int, variant, max_depth: int) -> dict:
+    """
+    analyse for a position in the START_STATE format with turn to move.
+    Builds its own board, so it can run in another process.
+    """
+    board = Board(variant.radius, state, variant=variant)
+    board.turn = turn
+    return analyse(board, max_depth)
@@ -0,0 +1,246 @@
+"""
+Mate-in-N solver using depth-first proof-number search (df-pn).
+
+The side to move at the root is the attacker. Nodes are scored with a
+(phi, delta) pair from the point of view of the side to move: phi is how
+hard it still looks to prove a win for them, delta how hard to prove a
+loss. Search always goes down the child that looks easiest, and only as
+long as the child stays below the thresholds passed down, so the whole
+search runs in a single depth-first pass with results kept in a bounded
+table. Table entries are keyed by the canonical position key from
+engine.symmetry plus the plies left, so symmetric positions share entries.
+
+Unlike engine.search, moves here are fully legal: a move that leaves the
+mover's king attacked is never played. A side with no legal moves is
+mated when in check and stalemated otherwise; stalemate does not count
+as a mate.
+"""
+
+import time
+import tracemalloc
+
+from .board import Board
+from .search import generate_moves, make_move, unmake_move
+from .symmetry import canonical_key
+
+INF = 10**9
+
+
+class SolverLimit(Exception):
+    """
+    Raised inside the search when the node budget runs out
+    """
+
+
+class MateSolver:
+    """
+    Proves or refutes a forced mate in at most max_moves moves by the side
+    to move. The node table holds at most table_size entries; when full,
+    the half whose results took the least work to find is dropped.
+    """
+
+    def __init__(self, board, table_size: int = 200000, max_nodes: int = 2000000):
+        self.board = board
+        self.table_size = table_size
+        self.max_nodes = max_nodes
+        self.table = {}
+        self.nodes = 0
+        self.peak_entries = 0
+
+    def solve(self, max_moves: int) -> dict:
+        """
+        Tries mates in 1, 2, ... up to max_moves moves and returns a dict with
+        "mate" (True proven, False refuted, None out of nodes), "mate_in",
+        the mating "line" and the search stats
+        """
+        start = time.perf_counter()
+        result = {"mate": False, "mate_in": None, "line": []}
+        try:
+            for moves in range(1, max_moves + 1):
+                plies = 2 * moves - 1
+                phi, _ = self.__mid(plies, INF, INF)
+                if phi == 0:
+                    result = {
+                        "mate": True,
+                        "mate_in": moves,
+                        "line": self.__line(plies),
+                    }
+                    break
+        except SolverLimit:
+            result["mate"] = None
+        result.update(
+            {
+                "nodes": self.nodes,
+                "table_entries": len(self.table),
+                "peak_table_entries": self.peak_entries,
+                "seconds": time.perf_counter() - start,
+            }
+        )
+        return result
+
+    def legal_moves(self):
+        """
+        The moves of the side to move that do not leave its king attacked
+        """
+        out = []
+        color = self.board.turn
+        for fro, to in generate_moves(self.board):
+            captured = make_move(self.board, fro, to)
+            if not self.board.in_check(color):
+                out.append((fro, to))
+            unmake_move(self.board, fro, to, captured)
+        return out
+
+    def __has_legal_move(self) -> bool:
+        color = self.board.turn
+        for fro, to in generate_moves(self.board):
+            captured = make_move(self.board, fro, to)
+            legal = not self.board.in_check(color)
+            unmake_move(self.board, fro, to, captured)
+            if legal:
+                return True
+        return False
+
+    def __key(self, plies: int):
+        return canonical_key(self.board)[0], plies
+
+    def __store(self, key, phi: int, delta: int, work: int):
+        if key not in self.table and len(self.table) >= self.table_size:
+            self.__collect()
+        self.table[key] = (phi, delta, work)
+        self.peak_entries = max(self.peak_entries, len(self.table))
+
+    def __collect(self):
+        # drop the half of the table that was cheapest to work out, mostly leaves
+        keys = sorted(self.table, key=lambda key: self.table[key][2])
+        for key in keys[: len(keys) // 2]:
+            del self.table[key]
+
+    def __terminal(self, moves, plies: int):
+        """
+        (phi, delta) if the node is decided without searching, else None
+        """
+        attacker = plies % 2 == 1
+        if not moves:
+            # the attacker stuck or the defender mated both lose for the side to move
+            if attacker or self.board.in_check(self.board.turn):
+                return INF, 0
+            return 0, INF
+        return None
+
+    def __mid(self, plies: int, th_phi: int, th_delta: int):
+        """
+        Searches the current position until its phi or delta reaches its
+        threshold, and returns (phi, delta)
+        """
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SolverLimit()
+        key = self.__key(plies)
+        phi, delta, work = self.table.get(key, (1, 1, 0))
+        if phi >= th_phi or delta >= th_delta:
+            return phi, delta
+
+        if plies == 0:
+            # only whether the defender is mated matters at the horizon
+            decided = (0, INF) if self.__has_legal_move() else self.__terminal([], 0)
+            self.__store(key, *decided, 1)
+            return decided
+        moves = self.legal_moves()
+        decided = self.__terminal(moves, plies)
+        if decided:
+            self.__store(key, *decided, 1)
+            return decided
+
+        # the child keys are found once, the loop below only reads the table
+        children = []
+        for fro, to in moves:
+            captured = make_move(self.board, fro, to)
+            children.append((fro, to, self.__key(plies - 1)))
+            unmake_move(self.board, fro, to, captured)
+
+        start_nodes = self.nodes
+        while True:
+            best = None
+            phi, delta = INF, 0
+            delta_2 = INF
+            for child in children:
+                child_phi, child_delta, _ = self.table.get(child[2], (1, 1, 0))
+                delta = min(INF, delta + child_phi)
+                if child_delta < phi:
+                    delta_2 = phi
+                    phi = child_delta
+                    best = (child, child_phi)
+                elif child_delta < delta_2:
+                    delta_2 = child_delta
+            if phi >= th_phi or delta >= th_delta:
+                break
+            (fro, to, _), best_phi = best
+            captured = make_move(self.board, fro, to)
+            try:
+                self.__mid(
+                    plies - 1,
+                    th_delta - delta + best_phi,
+                    min(th_phi, delta_2 + 1),
+                )
+            finally:
+                unmake_move(self.board, fro, to, captured)
+
+        self.__store(key, phi, delta, work + self.nodes - start_nodes)
+        return phi, delta
+
+    def __line(self, plies: int):
+        """
+        Follows proven entries from the root to give one mating line. May be
+        cut short if entries on the way were dropped from the table.
+        """
+        line = []
+        played = []
+        while plies > 0:
+            attacker = plies % 2 == 1
+            step = None
+            for fro, to in self.legal_moves():
+                captured = make_move(self.board, fro, to)
+                entry = self.table.get(self.__key(plies - 1))
+                unmake_move(self.board, fro, to, captured)
+                # the attacker needs a move that loses for the defender,
+                # every defence loses so any proven one will do
+                if entry and entry[1 if attacker else 0] == 0:
+                    step = (fro, to)
+                    break
+            if step is None:
+                break
+            fro, to = step
+            line.append(((fro.q, fro.r), (to.q, to.r)))
+            played.append((fro, to, make_move(self.board, fro, to)))
+            plies -= 1
+        for fro, to, captured in reversed(played):
+            unmake_move(self.board, fro, to, captured)
+        return line
+
+
+def solve_state(
+    state: dict,
+    turn: int = 0,
+    max_moves: int = 3,
+    variant=None,
+    measure_memory=False,
+    **options,
+) -> dict:
+    """
+    Solves a position given in the START_STATE format, with turn the side
+    to move. With measure_memory the peak memory of the search is added as
+    "peak_memory" in bytes, which slows the search down.
+    """
+    board = Board(initial_state=state, variant=variant)
+    board.turn = turn
+    solver = MateSolver(board, **options)
+    if not measure_memory:
+        return solver.solve(max_moves)
+    tracemalloc.start()
+    try:
+        result = solver.solve(max_moves)
+        result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
@@ -0,0 +1,125 @@
+"""
+Symmetries of the hex chess rules, used to store positions that are the
+same up to symmetry only once (transposition tables, books, caches).
+
+With s = -q - r, the transforms are
+    identity    (q, r) -> (q, r)
+    mirror      (q, r) -> (-q, -s)   files reversed, a <-> l
+    reflect     (q, r) -> (q, s)     ranks reversed, colors swapped
+    rotate      (q, r) -> (-q, -r)   180 degree turn, colors swapped
+where the color swapping ones also swap the side to move. Each transform
+is its own inverse, so the same call maps a position or move to the
+canonical frame and back again.
+
+A transform only counts for a variant if it maps the pawn start hexes
+onto themselves, since those decide which pawns may double step.
+"""
+
+from functools import cache
+
+from .tables import board_tables
+from .variant import default_variant
+
+
+class Transform:
+    def __init__(self, name: str, swaps_colors: bool, func):
+        self.name = name
+        self.swaps_colors = swaps_colors
+        self.func = func
+
+    def __call__(self, q: int, r: int) -> tuple[int, int]:
+        return self.func(q, r)
+
+    def __repr__(self):
+        return f"Transform: {self.name}"
+
+
+IDENTITY = Transform("identity", False, lambda q, r: (q, r))
+MIRROR = Transform("mirror", False, lambda q, r: (-q, q + r))
+REFLECT = Transform("reflect", True, lambda q, r: (q, -q - r))
+ROTATE = Transform("rotate", True, lambda q, r: (-q, -r))
+TRANSFORMS = [IDENTITY, MIRROR, REFLECT, ROTATE]
+
+
+@cache
+def valid_transforms(variant) -> list[Transform]:
+    """
+    The transforms that keep the variant's pawn start hexes in place
+    """
+    out = []
+    for transform in TRANSFORMS:
+        valid = True
+        for color in (0, 1):
+            new_color = 1 - color if transform.swaps_colors else color
+            moved = {transform(q, r) for q, r in variant.pawn_start_hexes[color]}
+            if moved != variant.pawn_start_hexes[new_color]:
+                valid = False
+        if valid:
+            out.append(transform)
+    return out
+
+
+@cache
+def _permutation(radius: int, transform: Transform) -> list[int]:
+    # for each hex index, the index of the hex the transform swaps it with
+    tables = board_tables(radius)
+    return [tables.index[transform(q, r)] for q, r in tables.coords]
+
+
+def transform_cells(cells: list, turn: int, radius: int, transform: Transform):
+    """
+    Applies the transform to a list of piece letters in board order
+    (None for empty) and the side to move
+    """
+    # transforms are their own inverse, so hex i takes the piece on hex permutation[i]
+    out = [cells[j] for j in _permutation(radius, transform)]
+    if transform.swaps_colors:
+        out = [letter.swapcase() if letter else None for letter in out]
+        turn = 1 - turn
+    return out, turn
+
+
+def canonical_cells(cells: list, turn: int, radius: int, variant=None):
+    """
+    Returns (key, transform) where key is the smallest position key of
+    every symmetric copy of the position, and transform maps the position
+    onto it
+    """
+    if variant is None:
+        variant = default_variant(radius)
+    cells = [letter or "." for letter in cells]
+    best = None
+    for transform in valid_transforms(variant):
+        key = "".join([cells[j] for j in _permutation(radius, transform)])
+        moved_turn = turn
+        if transform.swaps_colors:
+            key = key.swapcase()
+            moved_turn = 1 - turn
+        key += "wb"[moved_turn]
+        if best is None or key < best[0]:
+            best = (key, transform)
+    return best
+
+
+def canonical_key(board):
+    """
+    canonical_cells for a Board
+    """
+    cells = [tile.piece.letter if tile.piece else None for tile in board.hexes]
+    return canonical_cells(cells, board.turn, board.radius, board.variant)
+
+
+def canonical_position_key(position, variant=None):
+    """
+    canonical_cells for a history.Position
+    """
+    cells = list(position.cells())
+    return canonical_cells(cells, position.turn, position.radius, variant)
+
+
+def transform_move(move: tuple, transform: Transform) -> tuple:
+    """
+    Maps a ((q, r), (q, r)) move through the transform, in either direction
+    """
+    fro, to = move
+    return transform(*fro), transform(*to)
@@ -0,0 +1,127 @@
+"""
+Lookup tables that only depend on the size of the board. They are built the
+first time a radius is used and shared by every board of that radius, so
+move generation never has to search the board for a hex.
+"""
+
+import math
+from functools import cache
+
+ROOK_DIRECTIONS = [(0, 1), (1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1)]
+BISHOP_DIRECTIONS = [(1, 1), (-1, 2), (-2, 1), (-1, -1), (1, -2), (2, -1)]
+KNIGHT_STEPS = [
+    (2, 1),
+    (3, -1),
+    (3, -2),
+    (2, -3),
+    (1, -3),
+    (-1, -2),
+    (-2, -1),
+    (-3, 1),
+    (-2, 3),
+    (-3, 2),
+    (-1, 3),
+    (1, 2),
+]
+KING_STEPS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+# white moves towards +r, black towards -r
+PAWN_FORWARD = [(0, 1), (0, -1)]
+PAWN_CAPTURES = [[(1, 0), (-1, 1)], [(-1, 0), (1, -1)]]
+
+
+class BoardTables:
+    """
+    Coordinates of every hex in board order and, for each hex index,
+    the indexes reachable by each kind of move
+    """
+
+    def __init__(self, radius: int):
+        self.radius = radius
+        coords = []
+        for q in range(-radius, radius + 1):
+            for r in range(-radius, radius + 1):
+                s = -q + -r
+                if -radius <= s <= radius:
+                    coords.append((q, r))
+        self.coords = coords
+        self.index = {coord: i for i, coord in enumerate(coords)}
+
+        self.rook_rays = [self.__rays(q, r, ROOK_DIRECTIONS) for q, r in coords]
+        self.bishop_rays = [self.__rays(q, r, BISHOP_DIRECTIONS) for q, r in coords]
+        self.knight_steps = [self.__steps(q, r, KNIGHT_STEPS) for q, r in coords]
+        self.king_steps = [self.__steps(q, r, KING_STEPS) for q, r in coords]
+        # pawn tables are indexed by color first
+        self.pawn_forward = [
+            [self.index.get((q + dq, r + dr)) for q, r in coords]
+            for dq, dr in PAWN_FORWARD
+        ]
+        self.pawn_captures = [
+            [self.__steps(q, r, steps) for q, r in coords] for steps in PAWN_CAPTURES
+        ]
+
+    def __steps(self, q, r, steps):
+        # indexes of the in bounds hexes one step away
+        out = []
+        for dq, dr in steps:
+            i = self.index.get((q + dq, r + dr))
+            if i is not None:
+                out.append(i)
+        return out
+
+    def __rays(self, q, r, directions):
+        # for each direction, the indexes walked until the edge of the board
+        out = []
+        for dq, dr in directions:
+            ray = []
+            dest = (q + dq, r + dr)
+            while dest in self.index:
+                ray.append(self.index[dest])
+                dest = (dest[0] + dq, dest[1] + dr)
+            if ray:
+                out.append(ray)
+        return out
+
+
+@cache
+def board_tables(radius: int) -> BoardTables:
+    return BoardTables(radius)
+
+
+@cache
+def hex_geometry(radius: int, size: int, center: tuple) -> list:
+    """
+    For each hex index, the screen center and polygon points of the hex,
+    both as seen from white and from the flipped board
+    """
+    sqrt3 = math.sqrt(3)
+    out = []
+    for q, r in board_tables(radius).coords:
+        # First calculate the center of a hex
+        center_x = center[0] + 1.5 * size * q
+        center_y = center[1] - sqrt3 * size * (r + q / 2)
+        # the flipped board is the same point reflected through the center
+        center_x_flip = center[0] - 1.5 * size * q
+        center_y_flip = center[1] + sqrt3 * size * (r + q / 2)
+        out.append(
+            (
+                center_x,
+                center_y,
+                _polygon(center_x, center_y, size),
+                center_x_flip,
+                center_y_flip,
+                _polygon(center_x_flip, center_y_flip, size),
+            )
+        )
+    return out
+
+
+def _polygon(center_x, center_y, size):
+    # size is the distance from the center to each corner
+    points = []
+    for i in range(6):
+        angle = i * math.pi / 3
+        points.append(
+            f"{center_x + size * math.cos(angle)},\
+                          {center_y + size * math.sin(angle)}"
+        )
+    return " ".join(points)
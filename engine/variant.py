@@ -0,0 +1,132 @@
+"""
+Hex chess variants, described as data. A setup lists white's pieces as
+(file, rank): piece, where file is the q coordinate and rank counts hexes
+up the file from white's edge of the board, starting at 1. Black's pieces
+are white's reflected across the middle rank, so each variant only needs
+one side written down and the same setup fits any board radius.
+"""
+
+from functools import cache
+
+GLINSKI_SETUP = {
+    # back pieces
+    (-3, 1): "R",
+    (-2, 1): "N",
+    (-1, 1): "Q",
+    (0, 1): "B",
+    (0, 2): "B",
+    (0, 3): "B",
+    (1, 1): "K",
+    (2, 1): "N",
+    (3, 1): "R",
+    # pawns
+    (-4, 1): "P",
+    (-3, 2): "P",
+    (-2, 3): "P",
+    (-1, 4): "P",
+    (0, 5): "P",
+    (1, 4): "P",
+    (2, 3): "P",
+    (3, 2): "P",
+    (4, 1): "P",
+}
+
+MCCOOEY_SETUP = {
+    # back pieces
+    (-2, 1): "R",
+    (-1, 1): "Q",
+    (-1, 2): "N",
+    (0, 1): "B",
+    (0, 2): "B",
+    (0, 3): "B",
+    (1, 1): "K",
+    (1, 2): "N",
+    (2, 1): "R",
+    # pawns
+    (-3, 1): "P",
+    (-2, 2): "P",
+    (-1, 3): "P",
+    (0, 4): "P",
+    (1, 3): "P",
+    (2, 2): "P",
+    (3, 1): "P",
+}
+
+
+def rank_to_r(radius: int, q: int, rank: int) -> int:
+    """
+    Converts a rank (1 at white's edge) on file q to the r coordinate
+    """
+    return max(-radius, -radius - q) + rank - 1
+
+
+def large_board_setup(radius: int) -> dict:
+    """
+    Gliński's pieces on a bigger board, with the pawn wedge carried on
+    across the extra files so, as on Gliński's board, every file but the
+    two edge ones starts with a pawn
+    """
+    setup = {key: piece for key, piece in GLINSKI_SETUP.items() if piece != "P"}
+    for q in range(-(radius - 1), radius):
+        setup[(q, max(1, 5 - abs(q)))] = "P"
+    return setup
+
+
+class Variant:
+    """
+    A named starting setup on a board of the given radius
+    """
+
+    def __init__(self, name: str, radius: int, setup: dict):
+        self.name = name
+        self.radius = radius
+        self.setup = setup
+        self.start_state = {}
+        for (q, rank), piece_type in setup.items():
+            r = rank_to_r(radius, q, rank)
+            self.start_state[(q, r)] = (piece_type, 0)
+            # reflect across the middle rank for black, s takes the place of r
+            self.start_state[(q, -q - r)] = (piece_type, 1)
+        # pawns may move two hexes from the hexes they start on
+        self.pawn_start_hexes = [
+            {key for key, piece in self.start_state.items() if piece == ("P", color)}
+            for color in (0, 1)
+        ]
+
+    def __repr__(self):
+        return f"Variant: {self.name} (radius {self.radius})"
+
+
+VARIANTS = {
+    "glinski": Variant("Gliński", 5, GLINSKI_SETUP),
+    "mccooey": Variant("McCooey", 5, MCCOOEY_SETUP),
+}
+for radius in range(6, 11):
+    VARIANTS[f"glinski-{radius}"] = Variant(
+        f"Gliński radius {radius}", radius, large_board_setup(radius)
+    )
+
+
+@cache
+def default_variant(radius: int) -> Variant:
+    """
+    The Gliński setup for a board of the given radius. Below radius 5 the
+    two armies would overlap, so smaller boards have no default variant.
+    Cached, so every board of a radius shares one variant.
+    """
+    if radius < 5:
+        raise ValueError(f"no variant fits a board of radius {radius}")
+    if radius == 5:
+        return VARIANTS["glinski"]
+    return VARIANTS.get(f"glinski-{radius}") or Variant(
+        f"Gliński radius {radius}", radius, large_board_setup(radius)
+    )
+
+
+@cache
+def empty_variant(radius: int) -> Variant:
+    """
+    A variant with no setup, for boards that are given their position on
+    a radius no real variant fits. No pawn gets a double step.
+    """
+    return Variant(f"empty radius {radius}", radius, {})
@@ -81,6 +81,47 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# board_fragments holds rendered board svgs, bounded so old positions get culled
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "board_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "board-fragments",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 512},
+    },
+}
+
+
+# Games
+# how many games are kept in memory, and after how many seconds without
+# being looked at a game may be dropped to make room for a new one
+
+MAX_GAMES = 100
+
+GAME_IDLE_TIMEOUT = 3600
+
+
+# Background analysis
+# number of worker processes and how many plies deep each position is searched
+
+ANALYSIS_WORKERS = 2
+
+ANALYSIS_MAX_DEPTH = 4
+
+# how many positions may wait for a worker, and for how many seconds a
+# waiting position is kept without anyone polling it
+
+ANALYSIS_MAX_PENDING = 32
+
+ANALYSIS_POLL_TIMEOUT = 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 